@@ -0,0 +1,183 @@
+"""Read-through cache for hook tool calls made by a charm.
+
+Reads such as `self.model.get_secret(label=...)` run a hook tool
+(here secret-get) every time they're called,
+even when nothing could have changed since the last call in the same hook.
+Within a single event the data Juju hands out doesn't change
+except through the charm's own writes,
+so `HookToolCache` memoises read hook tools on the model backend,
+drops the affected entries when the charm writes (relation-set, secret-set, ...),
+and starts afresh for each event the framework emits.
+
+This isn't a Charmhub library: it's shared between the charms in this repo
+by keeping identical copies in each charm's lib/ directory.
+
+Usage, as early as possible in the charm's `__init__`:
+
+    import hookcache
+
+    class MyCharm(ops.CharmBase):
+        def __init__(self, framework):
+            super().__init__(framework)
+            self.hook_tool_cache = hookcache.HookToolCache(self)
+
+Hits and misses are counted per hook tool in `hits` and `misses`,
+and logged at the end of each dispatch.
+
+This relies on two ops internals, as ops has no public hook for either:
+the hook tool methods of `charm.model._backend` (shadowed by instance
+attributes), and the framework's event counter `framework._stored["event_count"]`
+(to tell events apart). If either is missing, as may happen after an ops
+upgrade, the cache logs a warning and passes every call straight through.
+"""
+
+import collections
+import copy
+import functools
+import logging
+import typing
+
+from ops.charm import CharmBase
+from ops.framework import CommitEvent, Object
+
+logger = logging.getLogger(__name__)
+
+# Backend methods whose results can be reused within an event.
+# is_leader is left out on purpose: ops already caches it with the right expiry.
+_READS = frozenset(
+    {
+        "action_get",
+        "config_get",
+        "credential_get",
+        "network_get",
+        "opened_ports",
+        "planned_units",
+        "relation_get",
+        "relation_ids",
+        "relation_list",
+        "relation_model_get",
+        "relation_remote_app_name",
+        "resource_get",
+        "secret_get",
+        "secret_info_get",
+        "status_get",
+        "storage_get",
+        "storage_list",
+    }
+)
+
+# Backend methods that write, and the reads whose cached results they make stale.
+_SECRET_READS = ("secret_get", "secret_info_get")
+_INVALIDATES: typing.Dict[str, typing.Tuple[str, ...]] = {
+    "close_port": ("opened_ports",),
+    "open_port": ("opened_ports",),
+    "relation_set": ("relation_get",),
+    "secret_add": _SECRET_READS,
+    "secret_remove": _SECRET_READS,
+    "secret_set": _SECRET_READS,
+    "status_set": ("status_get",),
+    "storage_add": ("storage_list",),
+    "update_relation_data": ("relation_get",),
+}
+
+
+class HookToolCache(Object):
+    """Memoise read hook tools on the charm's model backend."""
+
+    def __init__(self, charm: CharmBase):
+        super().__init__(charm, "hook_tool_cache")
+        self._framework = charm.framework
+        self._entries: typing.Dict[typing.Tuple[typing.Any, ...], typing.Any] = {}
+        self._event_count: typing.Optional[int] = None
+        self.hits: typing.Counter[str] = collections.Counter()
+        self.misses: typing.Counter[str] = collections.Counter()
+
+        self._backend = getattr(charm.model, "_backend", None)
+        self.enabled = self._backend is not None and self._current_event_count() is not None
+        if not self.enabled:
+            logger.warning("Hook tool cache disabled: ops internals it relies on not found")
+            return
+
+        for name in _READS:
+            if hasattr(self._backend, name):
+                setattr(self._backend, name, self._wrap_read(name, getattr(self._backend, name)))
+        for name, reads in _INVALIDATES.items():
+            if hasattr(self._backend, name):
+                method = getattr(self._backend, name)
+                setattr(self._backend, name, self._wrap_write(method, reads))
+
+        charm.framework.observe(charm.framework.on.commit, self._on_commit)
+
+    def clear(self) -> None:
+        """Forget every cached result."""
+        self._entries.clear()
+
+    def _invalidate(self, reads: typing.Iterable[str]) -> None:
+        for key in [key for key in self._entries if key[0] in reads]:
+            del self._entries[key]
+
+    def _current_event_count(self) -> typing.Optional[int]:
+        # The framework numbers every event it emits; a new number means a new event,
+        # so data changed outside the charm (for example by a test harness) is seen.
+        try:
+            return self._framework._stored["event_count"]
+        except (AttributeError, KeyError, TypeError):
+            return None
+
+    def _check_event(self) -> None:
+        event_count = self._current_event_count()
+        if event_count is None or event_count != self._event_count:
+            self._event_count = event_count
+            self.clear()
+
+    def _wrap_read(self, name: str, method: typing.Callable[..., typing.Any]):
+        @functools.wraps(method)
+        def wrapper(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+            if kwargs.get("refresh") or kwargs.get("peek"):
+                # secret-get --refresh/--peek must always go to Juju,
+                # and a refresh moves the tracked revision on.
+                self._invalidate(_SECRET_READS)
+                return method(*args, **kwargs)
+
+            self._check_event()
+            key = (name, args, tuple(sorted(kwargs.items())))
+            try:
+                if key in self._entries:
+                    self.hits[name] += 1
+                    return _copy(self._entries[key])
+            except TypeError:  # unhashable arguments, don't cache
+                return method(*args, **kwargs)
+
+            self.misses[name] += 1
+            result = method(*args, **kwargs)
+            self._entries[key] = _copy(result)
+            return result
+
+        return wrapper
+
+    def _wrap_write(self, method: typing.Callable[..., typing.Any], reads: typing.Tuple[str, ...]):
+        @functools.wraps(method)
+        def wrapper(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._invalidate(reads)
+
+        return wrapper
+
+    def _on_commit(self, _event: CommitEvent) -> None:
+        # Debug logs go to juju-log, itself a hook tool, so only log when the cache helped.
+        hits = sum(self.hits.values())
+        if hits:
+            logger.debug("Hook tool cache: %d hits, %d misses", hits, sum(self.misses.values()))
+
+
+def _copy(value: typing.Any) -> typing.Any:
+    """Copy plain containers, so callers can't change what's cached.
+
+    Only exact dicts and lists are copied; anything else is returned as is,
+    since other types (such as a test harness's config) may rely on being shared.
+    """
+    if type(value) in (dict, list):
+        return copy.deepcopy(value)
+    return value
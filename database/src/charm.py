@@ -6,6 +6,7 @@ import logging
 import random
 import typing
 
+import hookcache
 import ops
 
 logger = logging.getLogger(__name__)
@@ -16,6 +17,7 @@ class DatabaseCharm(ops.CharmBase):
 
     def __init__(self, framework: ops.Framework):
         super().__init__(framework)
+        self.hook_tool_cache = hookcache.HookToolCache(self)
         self.framework.observe(self.on["db"].relation_created, self._on_db_relation_created)
         self.framework.observe(self.on["db"].relation_broken, self._on_db_relation_broken)
         self.framework.observe(self.on.secret_rotate, self._on_secret_rotate)
@@ -73,8 +75,83 @@ class DatabaseCharm(ops.CharmBase):
         mode = event.params.get("mode")
         if mode == "exc":
             raise ValueError("a value error")
+        if mode == "profile":
+            self._profile(event)
+            return
         event.set_results({"params": event.params})
 
+    def _profile(self, event: ops.ActionEvent):
+        # Imported here to keep cProfile and tracemalloc out of every hook's startup.
+        import profiling
+
+        targets = {
+            "rotate": self._profile_secret_rotate,
+            "relation-created": lambda: self._profile_db_relation_created(
+                profiling.SYNTHETIC_RELATION_ID
+            ),
+        }
+        profilers = {
+            "cprofile": ("hot-functions", profiling.hot_functions),
+            "tracemalloc": ("allocation-sites", profiling.allocation_sites),
+        }
+        target = event.params.get("target", "rotate")
+        profiler = event.params.get("profiler", "cprofile")
+        top = event.params.get("top", 10)
+        if target not in targets:
+            event.fail(f"unknown target {target!r}, expected one of {sorted(targets)}")
+            return
+        if profiler not in profilers:
+            event.fail(f"unknown profiler {profiler!r}, expected one of {sorted(profilers)}")
+            return
+
+        errors: typing.List[Exception] = []
+
+        def run_target():
+            # Catch errors inside the profiled call, so the profile up to that point is kept.
+            try:
+                targets[target]()
+            except Exception as e:
+                errors.append(e)
+
+        result_key, run = profilers[profiler]
+        cache_hits = sum(self.hook_tool_cache.hits.values())
+        backend, _ = self._model_internals()
+        with profiling.Sandbox(backend) as sandbox:
+            lines = run(run_target, top)
+        cache_hits = sum(self.hook_tool_cache.hits.values()) - cache_hits
+        results = {
+            "target": target,
+            "profiler": profiler,
+            result_key: "\n".join(lines),
+            "hook-tool-calls": sum(sandbox.calls.values()),
+            "hook-tool-cache-hits": cache_hits,
+            "hook-tools": sandbox.hook_tools(),
+        }
+        if errors:
+            results["error"] = f"{type(errors[0]).__name__}: {errors[0]}"
+        event.set_results(results)
+        if errors:
+            event.fail(f"profiled handler {target!r} raised {results['error']}")
+
+    def _model_internals(self) -> typing.Tuple[typing.Any, typing.Any]:
+        """Return the model's backend and cache, which ops doesn't expose."""
+        model = self.model
+        return model._backend, model._cache  # pyright: ignore[reportPrivateUsage]
+
+    def _profile_secret_rotate(self):
+        handle = self.handle.nest("profile", "secret_rotate")
+        event = ops.SecretRotateEvent(handle, "secret:profile", "password")
+        event.framework = self.framework
+        self._on_secret_rotate(event)
+
+    def _profile_db_relation_created(self, relation_id: int):
+        backend, cache = self._model_internals()
+        relation = ops.Relation("db", relation_id, False, self.unit, backend, cache)
+        handle = self.handle.nest("profile", "db_relation_created")
+        event = ops.RelationCreatedEvent(handle, relation, app=relation.app)
+        event.framework = self.framework
+        self._on_db_relation_created(event)
+
 
 if __name__ == "__main__":  # pragma: nocover
     ops.main(DatabaseCharm)
@@ -0,0 +1,126 @@
+"""Helpers for profiling charm handlers from the debug action.
+
+A handler is run inside a `Sandbox`, which counts every hook tool the
+model backend runs, and records writes such as secret-set or relation-set
+without running them, so profiling a live unit doesn't change its secrets,
+relations or status.
+
+The sandbox also answers relation reads for `SYNTHETIC_RELATION_ID`,
+so relation handlers can be run against a relation that doesn't exist.
+"""
+
+import collections
+import cProfile
+import functools
+import pstats
+import tracemalloc
+import typing
+
+# Relation ID used for synthetic relations; Juju never hands out negative IDs.
+SYNTHETIC_RELATION_ID = -1
+SYNTHETIC_APP_NAME = "profile-app"
+
+# Hook tools that change model state, and the output to return instead of running them.
+_WRITES: typing.Dict[str, typing.Optional[str]] = {
+    "secret-add": "secret:profile",
+    "secret-set": None,
+    "secret-grant": None,
+    "secret-revoke": None,
+    "secret-remove": None,
+    "relation-set": None,
+    "status-set": None,
+    "application-version-set": None,
+    "open-port": None,
+    "close-port": None,
+}
+
+
+def _is_synthetic(args: typing.Tuple[str, ...]) -> bool:
+    """Report whether hook tool args refer to the synthetic relation."""
+    return "-r" in args[:-1] and args[args.index("-r") + 1] == str(SYNTHETIC_RELATION_ID)
+
+
+def _synthetic_read(args: typing.Tuple[str, ...]) -> typing.Any:
+    """Return the result of a relation read on the synthetic relation."""
+    if args[0] == "relation-list":
+        return SYNTHETIC_APP_NAME if "--app" in args else []
+    return {}
+
+
+class Sandbox:
+    """Context manager that counts (and sandboxes) hook tools run by a backend.
+
+    Every hook tool goes through the backend's `_run` method, which is shadowed
+    by an instance attribute while inside the `with` block. Calls answered
+    without running a tool, like a cached is-leader, aren't counted.
+    Backends that don't run hook tools, like the testing ones, aren't affected.
+    """
+
+    def __init__(self, backend: typing.Any):
+        self._backend = backend
+        self.calls: typing.Counter[str] = collections.Counter()
+
+    def __enter__(self) -> "Sandbox":
+        """Start counting and sandboxing the backend's hook tools."""
+        self._backend._run = self._wrap(self._backend._run)
+        return self
+
+    def __exit__(self, *exc_info: typing.Any) -> None:
+        """Let the backend run hook tools directly again."""
+        del self._backend._run
+
+    def _wrap(self, run: typing.Callable[..., typing.Any]) -> typing.Callable[..., typing.Any]:
+        @functools.wraps(run)
+        def wrapper(*args: str, **kwargs: typing.Any) -> typing.Any:
+            tool = args[0]
+            self.calls[tool] += 1
+            if tool in ("relation-list", "relation-get") and _is_synthetic(args):
+                return _synthetic_read(args)
+            if tool in _WRITES:
+                return _WRITES[tool]
+            return run(*args, **kwargs)
+
+        return wrapper
+
+    def hook_tools(self) -> typing.Dict[str, int]:
+        """Return the number of times each hook tool was run, like {"secret-set": 1}."""
+        return dict(sorted(self.calls.items()))
+
+
+# cProfile's key for a function, (filename, line number, function name), and its stats,
+# (primitive calls, calls, total time, cumulative time, callers).
+_FunctionKey = typing.Tuple[str, int, str]
+_FunctionStats = typing.Tuple[int, int, float, float, typing.Dict[typing.Any, typing.Any]]
+
+
+def hot_functions(func: typing.Callable[[], typing.Any], top: int) -> typing.List[str]:
+    """Run func under cProfile and return the top functions by cumulative time."""
+    profiler = cProfile.Profile()
+    profiler.runcall(func)
+    # The pstats stubs don't declare Stats.stats or func_std_string.
+    profile_stats = pstats.Stats(profiler)
+    stats = typing.cast(
+        typing.Dict[_FunctionKey, _FunctionStats],
+        profile_stats.stats,  # pyright: ignore[reportGeneralTypeIssues, reportAttributeAccessIssue]
+    )
+    func_std_string = typing.cast(
+        typing.Callable[[_FunctionKey], str],
+        pstats.func_std_string,  # pyright: ignore[reportGeneralTypeIssues, reportAttributeAccessIssue]
+    )
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+    lines: typing.List[str] = []
+    for location, (_, ncalls, _, cumtime, _) in rows[:top]:
+        lines.append(f"{cumtime:.6f}s {ncalls} calls {func_std_string(location)}")
+    return lines
+
+
+def allocation_sites(func: typing.Callable[[], typing.Any], top: int) -> typing.List[str]:
+    """Run func under tracemalloc and return the top allocation sites by size."""
+    tracemalloc.start()
+    try:
+        func()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+    return [str(stat) for stat in snapshot.statistics("lineno")[:top]]
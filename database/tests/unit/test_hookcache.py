@@ -0,0 +1,86 @@
+# Copyright 2022 Ben Hoyt
+# See LICENSE file for licensing details.
+
+import unittest
+from unittest.mock import patch
+
+from ops.testing import Harness
+
+from charm import DatabaseCharm
+
+
+class TestHookToolCache(unittest.TestCase):
+    def setUp(self):
+        self.harness = Harness(DatabaseCharm)
+        self.addCleanup(self.harness.cleanup)
+        self.harness.set_leader()
+        self.harness.begin()
+        self.cache = self.harness.charm.hook_tool_cache
+
+        self.relation_id = self.harness.add_relation("db", "webapp")
+        self.harness.add_relation_unit(self.relation_id, "webapp/0")
+        self.cache.hits.clear()
+        self.cache.misses.clear()
+
+    def test_repeated_read_hits(self):
+        backend = self.harness.charm.model._backend
+        first = backend.secret_get(label="password")
+        second = backend.secret_get(label="password")
+        self.assertEqual(first, second)
+
+        self.assertEqual(self.cache.hits["secret_get"], 1)
+
+    def test_results_are_copies(self):
+        backend = self.harness.charm.model._backend
+        backend.secret_get(label="password")["password"] = "changed"
+        self.assertNotEqual(backend.secret_get(label="password")["password"], "changed")
+
+    def test_write_invalidates(self):
+        backend = self.harness.charm.model._backend
+        app_name = self.harness.charm.app.name
+        before = backend.relation_get(self.relation_id, app_name, True)
+        self.assertNotIn("foo", before)
+
+        relation = self.harness.charm.model.get_relation("db", self.relation_id)
+        relation.data[self.harness.charm.app]["foo"] = "bar"
+
+        misses = self.cache.misses["relation_get"]
+        after = backend.relation_get(self.relation_id, app_name, True)
+        self.assertEqual(after["foo"], "bar")
+        self.assertEqual(self.cache.misses["relation_get"], misses + 1)
+
+    def test_new_event_clears(self):
+        backend = self.harness.charm.model._backend
+        backend.config_get()
+        self.harness.update_config({})
+        backend.config_get()
+        self.assertEqual(self.cache.misses["config_get"], 2)
+        self.assertEqual(self.cache.hits["config_get"], 0)
+
+    def test_commit_logs_only_with_hits(self):
+        backend = self.harness.charm.model._backend
+        backend.config_get()
+        with self.assertNoLogs("hookcache", "DEBUG"):
+            self.harness.framework.on.commit.emit()
+
+        backend.config_get()
+        backend.config_get()
+        with self.assertLogs("hookcache", "DEBUG") as logs:
+            self.harness.framework.on.commit.emit()
+        self.assertEqual(logs.output, ["DEBUG:hookcache:Hook tool cache: 1 hits, 2 misses"])
+
+
+class TestHookToolCacheDisabled(unittest.TestCase):
+    @patch("hookcache.HookToolCache._current_event_count", return_value=None)
+    def test_missing_internals_pass_through(self, _):
+        harness = Harness(DatabaseCharm)
+        self.addCleanup(harness.cleanup)
+        harness.begin()
+        cache = harness.charm.hook_tool_cache
+        self.assertFalse(cache.enabled)
+
+        backend = harness.charm.model._backend
+        backend.config_get()
+        backend.config_get()
+        self.assertEqual(cache.hits, {})
+        self.assertEqual(cache.misses, {})
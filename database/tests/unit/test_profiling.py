@@ -0,0 +1,85 @@
+# Copyright 2022 Ben Hoyt
+# See LICENSE file for licensing details.
+
+import os
+import pathlib
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+import ops
+
+import profiling
+
+# Each fake hook tool records how it was run, then prints its output.
+_FAKE_HOOK_TOOL = """#!/bin/sh
+echo "$(basename "$0") $*" >> {log}
+echo '{output}'
+"""
+
+
+class TestSandbox(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.bin = pathlib.Path(tmp.name)
+        self.log = self.bin / "calls.log"
+        self.log.touch()
+        env = {
+            "PATH": f"{self.bin}{os.pathsep}{os.environ['PATH']}",
+            "JUJU_UNIT_NAME": "database/0",
+            "JUJU_MODEL_NAME": "profile",
+            "JUJU_VERSION": "3.4.0",
+        }
+        patcher = patch.dict(os.environ, env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.backend = ops.model._ModelBackend()
+
+    def fake_hook_tool(self, name, output=""):
+        path = self.bin / name
+        path.write_text(_FAKE_HOOK_TOOL.format(log=self.log, output=output))
+        path.chmod(0o755)
+
+    def runs(self):
+        return self.log.read_text().splitlines()
+
+    def test_counts_hook_tools_run(self):
+        self.fake_hook_tool("is-leader", "true")
+        self.fake_hook_tool("relation-get", '{"foo": "bar"}')
+        with profiling.Sandbox(self.backend) as sandbox:
+            self.assertTrue(self.backend.is_leader())
+            self.assertTrue(self.backend.is_leader())  # cached by ops, so not run again
+            self.assertEqual(self.backend.relation_get(3, "webapp/0", False), {"foo": "bar"})
+        self.assertEqual(sandbox.hook_tools(), {"is-leader": 1, "relation-get": 1})
+        self.assertEqual(len(self.runs()), 2)
+
+    def test_writes_not_run(self):
+        self.fake_hook_tool("relation-set")
+        self.fake_hook_tool("secret-add", "secret:real")
+        app = Mock(spec=ops.Application)
+        with profiling.Sandbox(self.backend) as sandbox:
+            self.backend.update_relation_data(3, app, {"foo": "bar"})
+            self.assertEqual(self.backend.secret_add({"password": "x"}), "secret:profile")
+        self.assertEqual(sandbox.hook_tools(), {"relation-set": 1, "secret-add": 1})
+        self.assertEqual(self.runs(), [])
+
+    def test_synthetic_relation_reads(self):
+        self.fake_hook_tool("relation-list", '["webapp/0"]')
+        relation_id = profiling.SYNTHETIC_RELATION_ID
+        with profiling.Sandbox(self.backend) as sandbox:
+            self.assertEqual(self.backend.relation_list(relation_id), [])
+            app_name = self.backend.relation_remote_app_name(relation_id)
+            self.assertEqual(app_name, profiling.SYNTHETIC_APP_NAME)
+            self.assertEqual(self.backend.relation_get(relation_id, "database", True), {})
+            self.assertEqual(self.backend.relation_list(3), ["webapp/0"])
+        self.assertEqual(sandbox.hook_tools(), {"relation-get": 1, "relation-list": 3})
+        self.assertEqual(self.runs(), ["relation-list -r 3 --format=json"])
+
+    def test_restores_backend(self):
+        self.fake_hook_tool("status-set")
+        with profiling.Sandbox(self.backend):
+            pass
+        self.assertNotIn("_run", vars(self.backend))
+        self.backend.status_set("active", "ok")
+        self.assertEqual(len(self.runs()), 1)
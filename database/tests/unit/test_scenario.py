@@ -2,6 +2,7 @@ import pytest
 from ops import testing
 
 import charm
+import profiling
 
 
 def test_debug_action_default():
@@ -14,3 +15,52 @@ def test_debug_action_exception():
     ctx = testing.Context(charm.DatabaseCharm)
     with pytest.raises(testing.errors.UncaughtCharmError):
         ctx.run(ctx.on.action("debug", {"mode": "exc"}), testing.State())
+
+
+def test_debug_action_profile_rotate():
+    ctx = testing.Context(charm.DatabaseCharm)
+    secret = testing.Secret(
+        {"password": "old"}, id="secret:profile", label="password", owner="app"
+    )
+    state = testing.State(leader=True, secrets={secret})
+    ctx.run(ctx.on.action("debug", {"mode": "profile", "top": 5}), state)
+    results = ctx.action_results
+    assert results["target"] == "rotate"
+    assert results["profiler"] == "cprofile"
+    assert len(results["hot-functions"].splitlines()) == 5
+    assert "_on_secret_rotate" in results["hot-functions"]
+    # Scenario's backend doesn't run hook tools, so there are none to count or sandbox;
+    # see test_profiling for those.
+    assert results["hook-tool-calls"] == 0
+    assert results["hook-tools"] == {}
+
+
+def test_debug_action_profile_relation_created():
+    ctx = testing.Context(charm.DatabaseCharm)
+    params = {"mode": "profile", "target": "relation-created", "profiler": "tracemalloc"}
+    relation = testing.Relation("db", id=profiling.SYNTHETIC_RELATION_ID)
+    state = testing.State(leader=True, relations={relation})
+    ctx.run(ctx.on.action("debug", params), state)
+    results = ctx.action_results
+    assert results["profiler"] == "tracemalloc"
+    assert results["allocation-sites"]
+    assert "error" not in results
+
+
+def test_debug_action_profile_bad_target():
+    ctx = testing.Context(charm.DatabaseCharm)
+    with pytest.raises(testing.ActionFailed):
+        ctx.run(ctx.on.action("debug", {"mode": "profile", "target": "foo"}), testing.State())
+
+
+def test_debug_action_profile_handler_error():
+    ctx = testing.Context(charm.DatabaseCharm)
+    params = {"mode": "profile", "target": "relation-created"}
+    relation = testing.Relation("db", id=profiling.SYNTHETIC_RELATION_ID)
+    with pytest.raises(testing.ActionFailed) as exc_info:
+        ctx.run(ctx.on.action("debug", params), testing.State(relations={relation}))
+    assert "RelationDataAccessError" in exc_info.value.message
+    # The partial profile is still returned alongside the error.
+    results = ctx.action_results
+    assert "RelationDataAccessError" in results["error"]
+    assert "_on_db_relation_created" in results["hot-functions"]
@@ -1,27 +1,110 @@
 #!/usr/bin/env python3
 """Charm to test Pebble Notices."""
 
+import hashlib
 import logging
+import typing
 
 import ops
 
 logger = logging.getLogger(__name__)
 
+# Size of each part of a multipart upload (S3's minimum is 5MiB, except for the last part).
+PART_SIZE = 8 * 1024 * 1024
+
+# Suffix of the key an upload is completed to, before it's verified and moved into place.
+PARTIAL_SUFFIX = ".partial"
+
+
+def _composite_checksum(part_checksums: typing.List[str]) -> str:
+    """Return the S3-style checksum of a multipart object from its part checksums."""
+    digest = hashlib.sha256(b"".join(bytes.fromhex(c) for c in part_checksums)).hexdigest()
+    return f"{digest}-{len(part_checksums)}"
+
+
+class _NoSuchUploadError(Exception):
+    """Raised by the bucket for an upload ID it doesn't know (S3's NoSuchUpload).
+
+    Real buckets drop multipart uploads when they're aborted or expire.
+    """
+
 
 class _FakeS3Bucket:
-    def upload_fileobj(self, f, key):
-        content = f.read()
-        logger.info(f"Would upload {len(content)} bytes to key {key!r}")
+    """In-memory stand-in for an S3 bucket's multipart upload API.
+
+    Unlike a real bucket, uploads don't outlive the process,
+    so a later hook that tries to resume one gets _NoSuchUploadError.
+    """
+
+    def __init__(self):
+        self._uploads: typing.Dict[str, typing.Tuple[str, typing.Dict[int, bytes]]] = {}
+        self._objects: typing.Dict[str, typing.List[bytes]] = {}
+        self._upload_count = 0
+
+    def create_multipart_upload(self, key):
+        self._upload_count += 1
+        upload_id = f"upload-{self._upload_count}"
+        self._uploads[upload_id] = (key, {})
+        return upload_id
+
+    def _get_upload(self, upload_id):
+        if upload_id not in self._uploads:
+            raise _NoSuchUploadError(upload_id)
+        return self._uploads[upload_id]
+
+    def upload_part(self, upload_id, part_number, data):
+        logger.info(f"Would upload part {part_number} ({len(data)} bytes) of {upload_id}")
+        self._get_upload(upload_id)[1][part_number] = data
+        return hashlib.md5(data).hexdigest()
+
+    def complete_multipart_upload(self, upload_id, parts):
+        key, uploaded = self._get_upload(upload_id)
+        del self._uploads[upload_id]
+        for part_number, etag in parts:
+            if hashlib.md5(uploaded[part_number]).hexdigest() != etag:
+                raise ValueError(f"ETag mismatch for part {part_number} of {upload_id}")
+        self._objects[key] = [uploaded[part_number] for part_number, _ in parts]
+        logger.info(f"Would complete upload {upload_id} to key {key!r}")
+
+    def abort_multipart_upload(self, upload_id):
+        self._uploads.pop(upload_id, None)
+
+    def head_object(self, key):
+        parts = self._objects[key]
+        return {
+            "ContentLength": sum(len(part) for part in parts),
+            "ChecksumSHA256": _composite_checksum(
+                [hashlib.sha256(part).hexdigest() for part in parts]
+            ),
+        }
+
+    def get_object(self, key):
+        return b"".join(self._objects[key])
+
+    def copy_object(self, source_key, key):
+        self._objects[key] = list(self._objects[source_key])
+        logger.info(f"Would copy {source_key!r} to {key!r}")
+
+    def delete_object(self, key):
+        self._objects.pop(key, None)
 
 
 s3_bucket = _FakeS3Bucket()
 
 
+class _SourceChangedError(Exception):
+    """Raised when a part already uploaded no longer matches the source file."""
+
+
 class PostgresCharm(ops.CharmBase):
     """Charm to test Pebble Notices."""
 
+    _stored = ops.StoredState()
+
     def __init__(self, framework: ops.Framework):
         super().__init__(framework)
+        # Progress of the backup upload in flight, if any, so a retried hook can resume it.
+        self._stored.set_default(backup_upload={})
         # Note that "db" is the workload container's name
         framework.observe(self.on["db"].pebble_custom_notice, self._on_pebble_custom_notice)
 
@@ -29,12 +112,117 @@ class PostgresCharm(ops.CharmBase):
         if event.notice.key == "canonical.com/postgresql/backup-done":
             path = event.notice.last_data["path"]
             logger.info("Backup finished, copying %s to the cloud", path)
-            f = event.workload.pull(path, encoding=None)
-            s3_bucket.upload_fileobj(f, "db-backup.sql")
+            try:
+                self._upload_backup(event.workload, path, "db-backup.sql")
+            except (_SourceChangedError, _NoSuchUploadError) as e:
+                # Either the file changed or the bucket dropped the upload; start over.
+                logger.warning("Can't resume upload of %s (%r), starting again", path, e)
+                self._abort_backup_upload()
+                self._upload_backup(event.workload, path, "db-backup.sql")
 
         elif event.notice.key == "canonical.com/postgresql/other-thing":
             logger.info("Handling other thing")
 
+    def _upload_backup(self, container: ops.Container, path: str, key: str) -> None:
+        """Upload a file from the container in parts, resuming an earlier attempt if any.
+
+        Completed parts are recorded in stored state as they finish. The
+        whole file is re-read and hashed each time, and once every part is
+        uploaded the object's checksum is checked against the file's before
+        it replaces key.
+
+        Resuming in a later hook needs a bucket that keeps multipart uploads
+        across processes, as S3 does until they're completed or aborted.
+        With one that doesn't (like the fake bucket here), the retry gets
+        _NoSuchUploadError and starts over.
+        """
+        upload = self._start_or_resume_upload(path, key)
+        checksums, size = self._upload_missing_parts(container, path, upload)
+        self._complete_and_verify(upload, path, key, checksums, size)
+
+    def _start_or_resume_upload(self, path: str, key: str) -> typing.Any:
+        """Return the stored upload for path and key, starting a new one if needed."""
+        upload = self._stored.backup_upload
+        if upload and (upload["path"], upload["key"]) != (path, key):
+            self._abort_backup_upload()
+            upload = self._stored.backup_upload
+        if not upload:
+            upload_id = s3_bucket.create_multipart_upload(key + PARTIAL_SUFFIX)
+            self._stored.backup_upload = {"path": path, "key": key, "id": upload_id, "parts": []}
+            self._save_progress()
+        elif upload["parts"]:
+            logger.info("Resuming upload of %s after %d parts", path, len(upload["parts"]))
+        return self._stored.backup_upload
+
+    def _upload_missing_parts(
+        self, container: ops.Container, path: str, upload: typing.Any
+    ) -> typing.Tuple[typing.List[str], int]:
+        """Read the whole file, uploading parts not yet done; return part checksums and size."""
+        f = container.pull(path, encoding=None)
+        offset = 0
+        checksums: typing.List[str] = []
+        while True:
+            data = f.read(PART_SIZE)
+            if not data and checksums:
+                break
+            checksum = hashlib.sha256(data).hexdigest()
+            checksums.append(checksum)
+            part_number = len(checksums)
+            if part_number <= len(upload["parts"]):
+                done = upload["parts"][part_number - 1]
+                if (done["offset"], done["sha256"]) != (offset, checksum):
+                    raise _SourceChangedError(path)
+            else:
+                etag = s3_bucket.upload_part(upload["id"], part_number, data)
+                upload["parts"].append(
+                    {"offset": offset, "size": len(data), "sha256": checksum, "etag": etag}
+                )
+                self._save_progress()
+            offset += len(data)
+            if not data:  # empty file, uploaded as a single empty part
+                break
+        if len(checksums) != len(upload["parts"]):
+            raise _SourceChangedError(path)  # file is shorter than when upload started
+        return checksums, offset
+
+    def _complete_and_verify(
+        self, upload: typing.Any, path: str, key: str, checksums: typing.List[str], size: int
+    ) -> None:
+        """Complete the upload to a partial key, and only replace key if it matches the file.
+
+        A mismatched object is deleted, leaving the previous backup at key untouched.
+        """
+        s3_bucket.complete_multipart_upload(
+            upload["id"], [(i + 1, part["etag"]) for i, part in enumerate(upload["parts"])]
+        )
+        self._stored.backup_upload = {}
+        self._save_progress()
+
+        partial_key = key + PARTIAL_SUFFIX
+        head = s3_bucket.head_object(partial_key)
+        expected = _composite_checksum(checksums)
+        if (head["ContentLength"], head["ChecksumSHA256"]) != (size, expected):
+            s3_bucket.delete_object(partial_key)
+            raise RuntimeError(
+                f"uploaded {key!r} doesn't match {path}: {head['ContentLength']} bytes with "
+                f"checksum {head['ChecksumSHA256']}, expected {size} bytes with {expected}"
+            )
+        s3_bucket.copy_object(partial_key, key)
+        s3_bucket.delete_object(partial_key)
+        logger.info("Uploaded %s to %r (%d bytes, checksum %s)", path, key, size, expected)
+
+    def _abort_backup_upload(self) -> None:
+        if self._stored.backup_upload:
+            s3_bucket.abort_multipart_upload(self._stored.backup_upload["id"])
+        self._stored.backup_upload = {}
+        self._save_progress()
+
+    def _save_progress(self) -> None:
+        # Save stored state now rather than at the end of the hook, so the parts
+        # that finished survive the hook being killed or erroring part way through.
+        self.framework.save_snapshot(self._stored._data)
+        self.framework._storage.commit()
+
 
 if __name__ == "__main__":  # pragma: nocover
     ops.main(PostgresCharm)  # type: ignore
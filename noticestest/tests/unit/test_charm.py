@@ -1,31 +1,136 @@
 import unittest
 from unittest.mock import patch
 
-import ops
 import ops.testing
-from charm import PostgresCharm
+from charm import PostgresCharm, _FakeS3Bucket
 
 
 class TestCharm(unittest.TestCase):
-    @patch("charm.s3_bucket.upload_fileobj")
-    def test_backup_done(self, upload_fileobj):
-        harness = ops.testing.Harness(PostgresCharm)
-        self.addCleanup(harness.cleanup)
-        harness.begin()
-        harness.set_can_connect("db", True)
+    def setUp(self):
+        self.bucket = _FakeS3Bucket()
+        patcher = patch("charm.s3_bucket", self.bucket)
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
+        self.harness = ops.testing.Harness(PostgresCharm)
+        self.addCleanup(self.harness.cleanup)
+        self.harness.begin()
+        self.harness.set_can_connect("db", True)
+
+    def _write_backup(self, content):
         # Pretend backup file has been written
-        root = harness.get_filesystem_root("db")
-        (root / "tmp").mkdir()
-        (root / "tmp" / "mydb.sql").write_text("BACKUP")
+        root = self.harness.get_filesystem_root("db")
+        (root / "tmp").mkdir(exist_ok=True)
+        (root / "tmp" / "mydb.sql").write_bytes(content)
+
+    def _restart(self):
+        # Replace the harness with a fresh one, as the next hook runs in a new process,
+        # with only what the charm saved to its state storage carried over
+        stored_path = self.harness.charm._stored._data.handle.path
+        snapshot = self.harness.framework._storage.load_snapshot(stored_path)
+        self.harness = ops.testing.Harness(PostgresCharm)
+        self.addCleanup(self.harness.cleanup)
+        self.harness.framework._storage.save_snapshot(stored_path, snapshot)
+        self.harness.begin()
+        self.harness.set_can_connect("db", True)
 
+    def _notify_backup_done(self):
         # Notify to record the notice and fire the event
-        harness.pebble_notify(
+        self.harness.pebble_notify(
             "db", "canonical.com/postgresql/backup-done", data={"path": "/tmp/mydb.sql"}
         )
 
+    def test_backup_done(self):
+        self._write_backup(b"BACKUP")
+        self._notify_backup_done()
+
         # Ensure backup content was "uploaded" to S3
-        upload_fileobj.assert_called_once()
-        upload_f, upload_key = upload_fileobj.call_args.args
-        self.assertEqual(upload_f.read(), b"BACKUP")
-        self.assertEqual(upload_key, "db-backup.sql")
+        self.assertEqual(self.bucket.get_object("db-backup.sql"), b"BACKUP")
+        self.assertEqual(self.harness.charm._stored.backup_upload, {})
+
+    @patch("charm.PART_SIZE", 4)
+    def test_backup_resumes(self):
+        self._write_backup(b"0123456789abcdefXY")
+
+        # Fail the hook part way through, after two of the five parts are uploaded
+        upload_part = self.bucket.upload_part
+
+        def flaky_upload_part(upload_id, part_number, data):
+            if part_number == 3:
+                raise ConnectionError("network down")
+            return upload_part(upload_id, part_number, data)
+
+        with patch.object(self.bucket, "upload_part", flaky_upload_part):
+            with self.assertRaises(ConnectionError):
+                self._notify_backup_done()
+        self.assertEqual(len(self.harness.charm._stored.backup_upload["parts"]), 2)
+
+        # The retry runs in a new process. Like a real bucket (but unlike the fake one in
+        # charm.py), this test's bucket keeps the upload, so only the missing parts are sent
+        self._restart()
+        self._write_backup(b"0123456789abcdefXY")
+        with patch.object(self.bucket, "upload_part", wraps=upload_part) as mock_upload_part:
+            self._notify_backup_done()
+        part_numbers = [call.args[1] for call in mock_upload_part.call_args_list]
+        self.assertEqual(part_numbers, [3, 4, 5])
+        self.assertEqual(self.bucket.get_object("db-backup.sql"), b"0123456789abcdefXY")
+        self.assertEqual(self.harness.charm._stored.backup_upload, {})
+
+    @patch("charm.PART_SIZE", 4)
+    def test_backup_source_changed(self):
+        self._write_backup(b"0123456789")
+        upload_part = self.bucket.upload_part
+
+        def flaky_upload_part(upload_id, part_number, data):
+            if part_number == 2:
+                raise ConnectionError("network down")
+            return upload_part(upload_id, part_number, data)
+
+        with patch.object(self.bucket, "upload_part", flaky_upload_part):
+            with self.assertRaises(ConnectionError):
+                self._notify_backup_done()
+
+        # The upload started over, as the file changed since the first attempt
+        self._write_backup(b"ABCDEFGHIJ")
+        self._notify_backup_done()
+        self.assertEqual(self.bucket.get_object("db-backup.sql"), b"ABCDEFGHIJ")
+        self.assertNotIn("upload-1", self.bucket._uploads)
+
+    def test_backup_checksum_mismatch(self):
+        self._write_backup(b"GOOD")
+        self._notify_backup_done()
+
+        self._write_backup(b"BACKUP")
+        with patch.object(self.bucket, "head_object") as head_object:
+            head_object.return_value = {"ContentLength": 6, "ChecksumSHA256": "bad-1"}
+            with self.assertRaises(RuntimeError):
+                self._notify_backup_done()
+        # The bad object was deleted, and the previous backup left in place
+        self.assertEqual(list(self.bucket._objects), ["db-backup.sql"])
+        self.assertEqual(self.bucket.get_object("db-backup.sql"), b"GOOD")
+        # Nothing left to resume, so the next attempt uploads afresh
+        self.assertEqual(self.harness.charm._stored.backup_upload, {})
+
+    @patch("charm.PART_SIZE", 4)
+    def test_backup_upload_gone(self):
+        self._write_backup(b"0123456789")
+        upload_part = self.bucket.upload_part
+
+        def flaky_upload_part(upload_id, part_number, data):
+            if part_number == 2:
+                raise ConnectionError("network down")
+            return upload_part(upload_id, part_number, data)
+
+        with patch.object(self.bucket, "upload_part", flaky_upload_part):
+            with self.assertRaises(ConnectionError):
+                self._notify_backup_done()
+        self.assertEqual(len(self.harness.charm._stored.backup_upload["parts"]), 1)
+
+        # The retry runs in a new process, with a bucket that no longer knows the upload
+        self._restart()
+        self._write_backup(b"0123456789")
+        new_bucket = _FakeS3Bucket()
+        with patch("charm.s3_bucket", new_bucket):
+            self._notify_backup_done()
+        self.assertEqual(new_bucket.get_object("db-backup.sql"), b"0123456789")
+        self.assertEqual(self.harness.charm._stored.backup_upload, {})
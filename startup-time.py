@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Report the startup time of each charm's entry point, and check it against a budget.
+
+Every hook dispatch starts a new Python process, imports the charm and
+constructs it, so that time is paid on every hook. This runs
+"python -X importtime" on each charm's src/charm.py and aggregates the
+self time per top-level package, then times constructing the charm with
+ops.testing.Harness and dispatching update-status (the most frequent
+hook, which these charms don't observe). It exits with status 1 if any
+charm's import plus construction time is over budget.
+
+usage: startup-time.py [--budget-ms N] [--runs N] [--top N] [charm_dir ...]
+"""
+
+import argparse
+import collections
+import os
+import pathlib
+import subprocess
+import sys
+import typing
+
+ROOT = pathlib.Path(__file__).resolve().parent
+
+# Run in a fresh process with the charm importable; prints the construction time in ms.
+# ops.testing is imported up front, so only the charm's own import isn't timed here.
+_INIT_TIME_SCRIPT = """
+import inspect, time
+import ops, ops.testing
+import charm
+charm_class = next(
+    obj for obj in vars(charm).values()
+    if inspect.isclass(obj) and issubclass(obj, ops.CharmBase) and obj.__module__ == "charm"
+)
+harness = ops.testing.Harness(charm_class)
+start = time.perf_counter()
+harness.begin()
+harness.charm.on.update_status.emit()
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def _charm_env(charm_dir: pathlib.Path) -> typing.Dict[str, str]:
+    env = dict(os.environ)
+    paths = [str(charm_dir / "lib"), str(charm_dir / "src")]
+    env["PYTHONPATH"] = os.pathsep.join(paths + [env.get("PYTHONPATH", "")])
+    return env
+
+
+def import_times(
+    charm_dir: pathlib.Path, baseline: typing.Set[str]
+) -> typing.Tuple[float, typing.Dict[str, float]]:
+    """Return the total and per-package import time of a charm, in milliseconds.
+
+    Packages in baseline (already imported at interpreter startup) are left out.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import charm"],
+        cwd=charm_dir,
+        env=_charm_env(charm_dir),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total = 0.0
+    packages: typing.Dict[str, float] = collections.defaultdict(float)
+    found = False
+    # Lines look like "import time:  self [us] | cumulative | imported package",
+    # children first, with the package name indented by nesting depth.
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if name == " charm":  # top level, not indented
+            found = True
+            total = int(cumulative_us) / 1000
+        packages[name.strip().split(".")[0]] += int(self_us) / 1000
+    if not found:
+        raise RuntimeError(f"no import time reported for {charm_dir.name}/src/charm.py")
+
+    return total, {name: ms for name, ms in packages.items() if name not in baseline}
+
+
+def init_time(charm_dir: pathlib.Path) -> float:
+    """Return the time to construct a charm and dispatch update-status, in milliseconds."""
+    result = subprocess.run(
+        [sys.executable, "-c", _INIT_TIME_SCRIPT],
+        cwd=charm_dir,
+        env=_charm_env(charm_dir),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def _startup_modules() -> typing.Set[str]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "pass"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return {
+        line.split("|")[-1].strip().split(".")[0]
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "[us]" not in line
+    }
+
+
+def main() -> int:
+    """Print a startup-time report for each charm and return the exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=300, help="budget per charm")
+    parser.add_argument("--runs", type=int, default=3, help="runs per charm, best is used")
+    parser.add_argument("--top", type=int, default=5, help="packages to show per charm")
+    parser.add_argument("charm_dirs", nargs="*", type=pathlib.Path)
+    args = parser.parse_args()
+
+    charm_dirs = args.charm_dirs or sorted(p.parent.parent for p in ROOT.glob("*/src/charm.py"))
+    baseline = _startup_modules()
+    over_budget = []
+    for charm_dir in charm_dirs:
+        # Take the fastest runs, as slower ones are mostly noise from the machine.
+        import_ms, packages = min(
+            (import_times(charm_dir.resolve(), baseline) for _ in range(args.runs)),
+            key=lambda times: times[0],
+        )
+        init_ms = min(init_time(charm_dir.resolve()) for _ in range(args.runs))
+        total = import_ms + init_ms
+        status = "ok" if total <= args.budget_ms else "OVER BUDGET"
+        print(
+            f"{charm_dir.resolve().name}: {total:.1f}ms (import {import_ms:.1f}ms, "
+            f"construct {init_ms:.1f}ms; budget {args.budget_ms:.0f}ms) {status}"
+        )
+        slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+        for name, ms in slowest[: args.top]:
+            print(f"    {ms:8.1f}ms  {name}")
+        if total > args.budget_ms:
+            over_budget.append(charm_dir.resolve().name)
+
+    if over_budget:
+        print(f"over budget: {', '.join(over_budget)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Components of the status test charm, loaded lazily by the charm."""
+
+import logging
+
+import ops
+import reconcile
+import statuspool
+
+logger = logging.getLogger(__name__)
+
+
+def build(charm):
+    """Build the status pool and components, and return their reconciler."""
+    status_pool = statuspool.StatusPool(charm)
+    reconciler = reconcile.Reconciler(charm)
+    reconciler.add(Database(charm, status_pool))
+    reconciler.add(Webapp(charm, status_pool))
+    return reconciler
+
+
+class Database(reconcile.Component):
+    """Database component."""
+
+    config_keys = ("database_mode",)
+
+    def __init__(self, charm, status_pool):
+        super().__init__(charm, "database")
+
+        self.charm = charm
+        self.status = statuspool.Status("database")
+        status_pool.add(self.status)
+
+    def reconcile(self, config):
+        """Update status from the database mode."""
+        if "database_mode" not in config:
+            self.status.set(ops.BlockedStatus('"database_mode" required'))
+            return
+
+        mode = config["database_mode"]
+        logger.info("Using database mode %r", mode)
+        self.status.set(ops.ActiveStatus(f"db mode {mode!r}"))
+
+
+class Webapp(reconcile.Component):
+    """Web app component."""
+
+    config_keys = ("webapp_port",)
+
+    def __init__(self, charm, status_pool):
+        super().__init__(charm, "webapp")
+
+        self.charm = charm
+        self.status = statuspool.Status("webapp")
+        status_pool.add(self.status)
+
+    def reconcile(self, config):
+        """Update status from the web app port."""
+        if "webapp_port" not in config:
+            self.status.set(ops.BlockedStatus('"webapp_port" required'))
+            return
+
+        port = config["webapp_port"]
+        logger.info("Using web app port %r", port)
+        self.status.set(ops.ActiveStatus(f"web app port {port!r}"))
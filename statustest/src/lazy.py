@@ -0,0 +1,82 @@
+"""A mini library for deferring charm components until they're needed.
+
+Every dispatch starts a new Python process and constructs the charm,
+so anything imported or built in the charm's `__init__`
+costs time on every hook, even hooks that never use it.
+
+A `LazyObject` observes a set of events on behalf of an object
+that lives in another module.
+The module is only imported, and the object only built,
+when one of those events actually fires.
+The event that triggered the build is then passed on to the new object;
+after that, the object observes events itself as usual.
+"""
+
+import importlib
+import logging
+import time
+from typing import (
+    Any,
+    Dict,
+    Mapping,
+    Optional,
+)
+
+from ops.charm import (
+    CharmBase,
+)
+from ops.framework import (
+    BoundEvent,
+    EventBase,
+    Object,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LazyObject(Object):
+    """An object that is imported and built on the first event it handles."""
+
+    def __init__(
+        self,
+        charm: CharmBase,
+        key: str,
+        factory: str,
+        events: Mapping[BoundEvent, str],
+    ) -> None:
+        """Observe the given events, without importing or building anything yet.
+
+        factory: "module:function", called with the charm to build the object
+        events: maps each event to the name of the built object's public handler for it
+        """
+        super().__init__(charm, key)
+        self._charm = charm
+        self._factory = factory
+        self._instance: Optional[Any] = None
+        self._handlers: Dict[str, str] = {}
+        for bound_event, handler in events.items():
+            self._handlers[bound_event.event_kind] = handler
+            charm.framework.observe(bound_event, self._on_event)
+
+    @property
+    def loaded(self) -> bool:
+        """Report whether the object has been built in this dispatch."""
+        return self._instance is not None
+
+    def get(self) -> Any:
+        """Return the object, importing its module and building it if needed."""
+        if self._instance is None:
+            start = time.perf_counter()
+            module_name, _, function_name = self._factory.partition(":")
+            module = importlib.import_module(module_name)
+            self._instance = getattr(module, function_name)(self._charm)
+            elapsed = time.perf_counter() - start
+            logger.debug("Loaded %s in %.1fms", self._factory, elapsed * 1000)
+        return self._instance
+
+    def _on_event(self, event: EventBase) -> None:
+        if self._instance is not None:
+            # Already built earlier in this dispatch, and observing for itself.
+            return
+        instance = self.get()
+        getattr(instance, self._handlers[event.handle.kind])(event)
@@ -0,0 +1,128 @@
+"""A mini library for reconciling charm components against config.
+
+Each component declares the config keys it cares about.
+The reconciler reads the charm config once per dispatch,
+computes a digest of each component's keys,
+and only calls a component's `reconcile` when that digest
+differs from the one persisted after the last successful reconcile.
+
+This avoids every component observing config-changed separately
+and re-doing its work on hooks that have nothing to do with config.
+"""
+
+import abc
+import hashlib
+import json
+import logging
+from typing import (
+    Any,
+    Dict,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from ops.charm import (
+    CharmBase,
+    ConfigChangedEvent,
+    UpgradeCharmEvent,
+)
+from ops.framework import (
+    Object,
+    StoredState,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Component(Object, abc.ABC):
+    """A charm component whose state is derived from a subset of config.
+
+    Subclasses set `config_keys` and implement `reconcile`.
+    """
+
+    # Config keys this component depends on.
+    # The component is only reconciled when one of these changes.
+    config_keys: Tuple[str, ...] = ()
+
+    @abc.abstractmethod
+    def reconcile(self, config: Mapping[str, Any]) -> None:
+        """Bring the component in line with the given config.
+
+        config: only the declared `config_keys` that are set
+        """
+
+
+class Reconciler(Object):
+    """Reconcile a set of components when their config changes.
+
+    Digests are kept in stored state,
+    so "changed" means changed since the last dispatch that reconciled it.
+    """
+
+    _stored = StoredState()
+
+    def __init__(self, charm: CharmBase) -> None:
+        """Init the reconciler and observe the events that may change config."""
+        super().__init__(charm, "reconciler")
+        self._charm = charm
+        self._components: Dict[str, Component] = {}
+        self._config: Optional[Dict[str, Any]] = None
+        self._stored.set_default(digests={})
+
+        charm.framework.observe(charm.on.config_changed, self.handle_config_changed)
+        charm.framework.observe(charm.on.upgrade_charm, self.handle_upgrade_charm)
+
+    def add(self, component: Component) -> None:
+        """Add a component to be reconciled.
+
+        If the component has never been reconciled (no persisted digest),
+        reconcile it straight away so it starts out with a sensible state.
+        """
+        self._components[component.handle.key] = component
+        if component.handle.key not in self._stored.digests:
+            self._reconcile(component)
+
+    def reconcile_all(self) -> None:
+        """Reconcile every component whose config digest has changed."""
+        for component in self._components.values():
+            self._reconcile(component)
+
+    def handle_config_changed(self, _event: ConfigChangedEvent) -> None:
+        """Reconcile the components whose config has changed."""
+        # Drop any snapshot taken earlier, as config may have changed since.
+        self._config = None
+        self.reconcile_all()
+
+    def handle_upgrade_charm(self, _event: UpgradeCharmEvent) -> None:
+        """Forget the digests, so the next config-changed reconciles everything.
+
+        New charm code may reconcile differently.
+        """
+        self._stored.digests = {}
+
+    def _read_config(self) -> Dict[str, Any]:
+        """Return a snapshot of the charm config, read at most once per dispatch."""
+        if self._config is None:
+            self._config = dict(self._charm.model.config)
+        return self._config
+
+    def _reconcile(self, component: Component) -> None:
+        config = self._read_config()
+        subset = {key: config[key] for key in component.config_keys if key in config}
+        digest = _digest(subset)
+        name = component.handle.key
+        if self._stored.digests.get(name) == digest:
+            logger.debug("Config for %r unchanged, skipping reconcile", name)
+            return
+
+        component.reconcile(subset)
+        # Only record the digest once reconcile succeeds,
+        # so a failed reconcile is retried on the next dispatch.
+        self._stored.digests[name] = digest
+
+
+def _digest(config: Mapping[str, Any]) -> str:
+    """Return a stable digest of a config mapping."""
+    encoded = json.dumps(config, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
@@ -1,15 +1,20 @@
+import subprocess
+import sys
 import unittest
+from unittest.mock import patch
 
 import ops
 import ops.testing
+import reconcile
 from charm import StatustestCharm
+from components import Database, Webapp
 
 
 class TestCharm(unittest.TestCase):
     def setUp(self):
         self.harness = ops.testing.Harness(StatustestCharm)
         self.addCleanup(self.harness.cleanup)
-        self.harness.begin()
+        self.harness.begin_with_initial_hooks()
 
     def test_initial(self):
         status = self.harness.model.unit.status
@@ -33,3 +38,55 @@ class TestCharm(unittest.TestCase):
         status = self.harness.model.unit.status
         self.assertEqual(status.name, "active")
         self.assertEqual(status.message, "(database) db mode 'single'")
+
+    def test_unrelated_config_skips_reconcile(self):
+        self.harness.update_config({"database_mode": "single"})
+        with patch.object(Webapp, "reconcile") as webapp_reconcile:
+            with patch.object(Database, "reconcile") as database_reconcile:
+                self.harness.update_config({"database_mode": "multi"})
+        database_reconcile.assert_called_once_with({"database_mode": "multi"})
+        webapp_reconcile.assert_not_called()
+
+    def test_unchanged_config_skips_reconcile(self):
+        self.harness.update_config({"database_mode": "single", "webapp_port": 8080})
+        with patch.object(Database, "reconcile") as database_reconcile:
+            self.harness.update_config({"database_mode": "single"})
+        database_reconcile.assert_not_called()
+
+    def test_upgrade_charm_reconciles_everything(self):
+        self.harness.update_config({"database_mode": "single", "webapp_port": 8080})
+        self.harness.charm.on.upgrade_charm.emit()
+        with patch.object(Webapp, "reconcile") as webapp_reconcile:
+            with patch.object(Database, "reconcile") as database_reconcile:
+                self.harness.charm.on.config_changed.emit()
+        database_reconcile.assert_called_once_with({"database_mode": "single"})
+        webapp_reconcile.assert_called_once_with({"webapp_port": 8080})
+
+    def test_component_must_implement_reconcile(self):
+        class Incomplete(reconcile.Component):
+            pass
+
+        with self.assertRaises(TypeError):
+            Incomplete(self.harness.charm, "incomplete")
+
+
+class TestLazy(unittest.TestCase):
+    def test_import_is_lazy(self):
+        code = "import sys, charm; print(sorted({'components', 'statuspool'} & set(sys.modules)))"
+        output = subprocess.check_output([sys.executable, "-c", code], text=True)
+        self.assertEqual(output.strip(), "[]")
+
+    def test_unrelated_event_builds_nothing(self):
+        harness = ops.testing.Harness(StatustestCharm)
+        self.addCleanup(harness.cleanup)
+        harness.begin()
+        harness.charm.on.start.emit()
+        self.assertFalse(harness.charm.components.loaded)
+
+    def test_config_changed_builds_components(self):
+        harness = ops.testing.Harness(StatustestCharm)
+        self.addCleanup(harness.cleanup)
+        harness.begin()
+        harness.update_config({"database_mode": "single", "webapp_port": 8080})
+        self.assertTrue(harness.charm.components.loaded)
+        self.assertEqual(harness.model.unit.status.name, "active")
@@ -3,6 +3,7 @@
 
 import logging
 
+import hookcache
 from ops.charm import CharmBase
 from ops.main import main
 from ops.model import ActiveStatus
@@ -15,16 +16,17 @@ class WebAppCharm(CharmBase):
 
     def __init__(self, *args):
         super().__init__(*args)
+        self.hook_tool_cache = hookcache.HookToolCache(self)
         self.framework.observe(self.on.db_relation_changed, self._on_db_relation_changed)
         self.framework.observe(self.on.secret_changed, self._on_secret_changed)
 
     def _on_db_relation_changed(self, event):
         relation_data = event.relation.data[event.app]
         logger.info(f"_on_db_relation_changed: {event.relation} data={relation_data}")
-        if "db_password_id" not in event.relation.data[event.app]:
+        if "db_password_id" not in relation_data:
             event.defer()
             return
-        secret_id = event.relation.data[event.app]["db_password_id"]
+        secret_id = relation_data["db_password_id"]
         secret = self.model.get_secret(id=secret_id, label="db_password")
         content = secret.get_content()
         # NOTE: Don't log the secret content for real charms!